@@ -1,253 +1,492 @@
-import re
+import io
+import string
 import sys
+import weakref
+from typing import Any, Callable, TextIO
+
+try:
+    from mypy_extensions import mypyc_attr
+except ImportError:  # only needed when the module is compiled with mypyc
+    def mypyc_attr(*attrs: str, **kwattrs: Any) -> Callable[[Any], Any]:  # type: ignore[misc]
+        return lambda cls: cls
+
+
+_ATOM_CHARS = frozenset(string.ascii_letters + string.digits)
+
+# operator tokens are always these exact objects, so the many
+# node.operator == ... checks succeed on the identity fast path
+_OP_AND = sys.intern('^')
+_OP_OR = sys.intern('v')
+_OP_IMP = sys.intern('->')
+_OP_IFF = sys.intern('<->')
+_OPERATORS = frozenset(('(', ')', '~', _OP_OR, _OP_AND, _OP_IMP, _OP_IFF))
+
+
+def _tokenize(text: str) -> list[str]:
+    """Single left-to-right scan of the formula into tokens."""
+    tokens: list[str] = []
+    i = 0
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if c.isspace():
+            i += 1
+        elif c in _ATOM_CHARS:
+            # atoms first, so 'var3' stays one token instead of 'v' + 'ar3'
+            j = i + 1
+            while j < n and text[j] in _ATOM_CHARS:
+                j += 1
+            tokens.append(sys.intern(text[i:j]))  # also makes a lone 'v' the _OP_OR object
+            i = j
+        elif c in '^~()':
+            tokens.append(sys.intern(c))
+            i += 1
+        elif c == '-' and text.startswith(_OP_IMP, i):
+            tokens.append(_OP_IMP)
+            i += 2
+        elif c == '<' and text.startswith(_OP_IFF, i):
+            tokens.append(_OP_IFF)
+            i += 3
+        else:
+            raise ValueError(f"Unexpected character: {c}")
+    return tokens
 
 
+@mypyc_attr(native_class=False)  # mypyc native classes can't be weakly referenced
 class Node:
     """Base class for all AST nodes."""
-    pass
+    __slots__ = ('__weakref__',)  # so the intern tables below can hold nodes weakly
 
 
+@mypyc_attr(native_class=False)
 class Variable(Node):
     """Variables: A, B, x1"""
+    __slots__ = ('name',)
 
-    def __init__(self, name):
+    def __init__(self, name: str):
         self.name = name
 
-    def __repr__(self):
+    def __repr__(self) -> str:
         return self.name
 
 
+@mypyc_attr(native_class=False)
 class UnaryOp(Node):
     """Unary op:  NOT (~)"""
+    __slots__ = ('operand',)
 
-    def __init__(self, operand):
+    def __init__(self, operand: Node):
         self.operand = operand
 
-    def __repr__(self):
+    def __repr__(self) -> str:
         return f"~{self.operand}"
 
 
+@mypyc_attr(native_class=False)
 class BinaryOp(Node):
     """Binary ops: ^, v, ->, <->"""
+    __slots__ = ('left', 'right', 'operator')
 
-    def __init__(self, left, right, operator):
+    def __init__(self, left: Node, right: Node, operator: str):
         self.left = left
         self.right = right
         self.operator = operator
 
-    def __repr__(self):
+    def __repr__(self) -> str:
         return f"({self.left} {self.operator} {self.right})"
 
 
+# Hash-consing: structurally identical subtrees are one shared object, so
+# copies made by the rewrites (e.g. both sides of '<->') are rewritten once.
+# Node ids in the keys stay valid because an interned node keeps its children alive.
+_INTERN_VAR: 'weakref.WeakValueDictionary[str, Variable]' = weakref.WeakValueDictionary()
+_INTERN_NOT: 'weakref.WeakValueDictionary[int, UnaryOp]' = weakref.WeakValueDictionary()
+_INTERN_BIN: 'weakref.WeakValueDictionary[tuple[int, int, str], BinaryOp]' = weakref.WeakValueDictionary()
+
+
+def _mk_var(name: str) -> Variable:
+    node = _INTERN_VAR.get(name)
+    if node is None:
+        node = _INTERN_VAR[name] = Variable(name)
+    return node
+
+
+def _mk_not(operand: Node) -> UnaryOp:
+    node = _INTERN_NOT.get(id(operand))
+    if node is None:
+        node = _INTERN_NOT[id(operand)] = UnaryOp(operand)
+    return node
+
+
+def _mk_bin(left: Node, right: Node, operator: str) -> BinaryOp:
+    key = (id(left), id(right), operator)
+    node = _INTERN_BIN.get(key)
+    if node is None:
+        node = _INTERN_BIN[key] = BinaryOp(left, right, operator)
+    return node
+
+
 class LogicParser:
-    def __init__(self):
-        self.token_pattern = re.compile(r'\s*(<->|->|[a-zA-Z0-9]+|[v\^~()])\s*')
-        self.tokens = []
-        self.pos = 0
-
-    def parse(self, text):
-        self.tokens = [t for t in self.token_pattern.findall(text) if t.strip()]
-        self.pos = 0
+    # binding strength of the binary operators, all of them left-associative
+    PREC = {_OP_IFF: 1, _OP_IMP: 2, _OP_OR: 3, _OP_AND: 4}
+
+    def __init__(self) -> None:
+        self.tokens: list[str] = []
+
+    def parse(self, text: str) -> Node:
+        """Shunting-yard parse of the token list into an AST, no recursion."""
+        self.tokens = _tokenize(text)
         if not self.tokens:
             raise ValueError("Empty formula")
-        ast = self._parse_iff()
-        if self.pos < len(self.tokens):
-            raise ValueError(f"Unexpected token: {self.tokens[self.pos]}")
-        return ast
-
-    def _peek(self):
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
-
-    def _consume(self, expected=None):
-        token = self._peek()
-        if expected and token != expected:
-            raise ValueError(f"Expected: {expected}, Found: {token}")
-        self.pos += 1
-        return token
-
-    def _parse_iff(self):
-        node = self._parse_implies()
-        while self._peek() == '<->':
-            op = self._consume()
-            right = self._parse_implies()
-            node = BinaryOp(node, right, op)
-        return node
-
-    def _parse_implies(self):
-        node = self._parse_or()
-        while self._peek() == '->':
-            op = self._consume()
-            right = self._parse_or()
-            node = BinaryOp(node, right, op)
-        return node
-
-    def _parse_or(self):
-        node = self._parse_and()
-        while self._peek() == 'v':
-            op = self._consume()
-            right = self._parse_and()
-            node = BinaryOp(node, right, op)
-        return node
-
-    def _parse_and(self):
-        node = self._parse_not()
-        while self._peek() == '^':
-            op = self._consume()
-            right = self._parse_not()
-            node = BinaryOp(node, right, op)
-        return node
-
-    def _parse_not(self):
-        if self._peek() == '~':
-            self._consume()
-            return UnaryOp(self._parse_not())
-        return self._parse_atom()
-
-    def _parse_atom(self):
-        token = self._peek()
-        if token == '(':
-            self._consume()
-            node = self._parse_iff()
-            self._consume(')')
-            return node
-        elif token and re.match(r'^[a-zA-Z0-9]+$', token):
-            return Variable(self._consume())
+
+        prec = self.PREC
+        operands: list[Node] = []   # finished subtrees
+        operators: list[str] = []  # pending binary ops, '(' markers and prefix '~'
+        expect_operand = True
+
+        for token in self.tokens:
+            if expect_operand:
+                if token == '~' or token == '(':
+                    operators.append(token)
+                elif token not in _OPERATORS:  # anything else _tokenize yields is an atom; 'v' never is
+                    operands.append(_mk_var(token))
+                    self._apply_negations(operands, operators)
+                    expect_operand = False
+                else:
+                    raise ValueError(f"Unexpected token: {token}")
+            elif token in prec:
+                # pop everything that binds at least as tightly (left-assoc)
+                while operators and operators[-1] in prec and prec[operators[-1]] >= prec[token]:
+                    self._reduce(operands, operators.pop())
+                operators.append(token)
+                expect_operand = True
+            elif token == ')':
+                while operators and operators[-1] != '(':
+                    self._reduce(operands, operators.pop())
+                if not operators:
+                    raise ValueError(f"Unexpected token: {token}")
+                operators.pop()
+                self._apply_negations(operands, operators)
+            elif '(' in operators:
+                raise ValueError(f"Expected: ), Found: {token}")
+            else:
+                raise ValueError(f"Unexpected token: {token}")
+
+        if expect_operand:
+            raise ValueError("Unexpected token: None")
+        while operators:
+            op = operators.pop()
+            if op == '(':
+                raise ValueError("Expected: ), Found: None")
+            self._reduce(operands, op)
+        return operands[0]
+
+    @staticmethod
+    def _reduce(operands: list[Node], op: str) -> None:
+        right = operands.pop()
+        operands[-1] = _mk_bin(operands[-1], right, op)
+
+    @staticmethod
+    def _apply_negations(operands: list[Node], operators: list[str]) -> None:
+        # the '~'s on top of the stack are exactly the ones prefixing the operand just finished
+        while operators and operators[-1] == '~':
+            operators.pop()
+            operands[-1] = _mk_not(operands[-1])
+
+
+def _children(node: Node) -> tuple[Node, ...]:
+    if type(node) is BinaryOp:
+        return (node.left, node.right)
+    if type(node) is UnaryOp:
+        return (node.operand,)
+    return ()
+
+
+def _post_order(root: Node) -> list[Node]:
+    """Distinct nodes of the tree, every child listed before its parents."""
+    order: list[Node] = []
+    seen: set[int] = set()
+    stack: list[tuple[Node, bool]] = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            order.append(node)
+            continue
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        stack.append((node, True))
+        for child in reversed(_children(node)):
+            stack.append((child, False))
+    return order
+
+
+def _balanced(nodes: list[Node], operator: str) -> Node:
+    """Join nodes left to right with the operator as a tree of logarithmic depth."""
+    while len(nodes) > 1:
+        paired: list[Node] = [_mk_bin(nodes[i], nodes[i + 1], operator) for i in range(0, len(nodes) - 1, 2)]
+        if len(nodes) % 2:
+            paired.append(nodes[-1])
+        nodes = paired
+    return nodes[0]
+
+
+def _chain(node: Node, operator: str) -> list[Node]:
+    """Operands of a chain of the given operator ('^' or 'v'), left to right."""
+    result: list[Node] = []
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if type(n) is BinaryOp and n.operator == operator:
+            stack.append(n.right)
+            stack.append(n.left)
         else:
-            raise ValueError(f"Unexpected token: {token}")
+            result.append(n)
+    return result
 
 
-def eliminate_implications(node):
+def eliminate_implications(node: Node) -> Node:
     """Step 1: eliminates the implications and biconditionals (A -> B and A <-> B)."""
-    if isinstance(node, BinaryOp): # if its a binary operator
-        left_st = eliminate_implications(node.left) # recursively process the left child
-        right_st = eliminate_implications(node.right) # similarly, right child (these are bottom up calls)
-        if node.operator == '->':
-            # from (A -> B)  to  (~A v B)
-            return BinaryOp(UnaryOp(left_st), right_st, 'v')
-        elif node.operator == '<->':
-            # from (A <-> B)  to  (~A v B) ^ (~B v A)
-            return BinaryOp(
-                BinaryOp(UnaryOp(left_st), right_st, 'v'),
-                BinaryOp(UnaryOp(right_st), left_st, 'v'),
-                '^'
-            )
-        return BinaryOp(left_st, right_st, node.operator)
-    elif isinstance(node, UnaryOp): # if its a unary operator, negation
-        return UnaryOp(eliminate_implications(node.operand)) # recursively process the operand, add negation after the return. 
-    return node
+    new: dict[int, Node] = {}  # id(old node) -> rewritten node, filled bottom up
+    for n in _post_order(node):
+        if type(n) is BinaryOp: # if its a binary operator
+            left_st = new[id(n.left)] # children are already rewritten (post order)
+            right_st = new[id(n.right)]
+            if n.operator == _OP_IMP:
+                # from (A -> B)  to  (~A v B)
+                out: Node = _mk_bin(_mk_not(left_st), right_st, _OP_OR)
+            elif n.operator == _OP_IFF:
+                # from (A <-> B)  to  (~A v B) ^ (~B v A)
+                out = _mk_bin(
+                    _mk_bin(_mk_not(left_st), right_st, _OP_OR),
+                    _mk_bin(_mk_not(right_st), left_st, _OP_OR),
+                    _OP_AND
+                )
+            elif left_st is n.left and right_st is n.right:
+                out = n # nothing changed below, share the node instead of copying it
+            else:
+                out = _mk_bin(left_st, right_st, n.operator)
+        elif type(n) is UnaryOp: # if its a unary operator, negation
+            operand = new[id(n.operand)]
+            out = n if operand is n.operand else _mk_not(operand)
+        else:
+            out = n
+        new[id(n)] = out
+    return new[id(node)]
 
 
-def convert_to_nnf(node):
+def convert_to_nnf(node: Node) -> Node:
     """Step 2: Negation Normal Form (NNF)."""
-    # ~~A => A
-    if isinstance(node, UnaryOp) and isinstance(node.operand, UnaryOp):
-        return convert_to_nnf(node.operand.operand)
-
-    # De Morgan
-    if isinstance(node, UnaryOp) and isinstance(node.operand, BinaryOp):
-        inner = node.operand
-        if inner.operator == 'v': # ~(A v B) => ~A ^ ~B
-            return BinaryOp(convert_to_nnf(UnaryOp(inner.left)), 
-                            convert_to_nnf(UnaryOp(inner.right)), '^')
-        elif inner.operator == '^': # ~(A ^ B) => ~A v ~B
-            return BinaryOp(convert_to_nnf(UnaryOp(inner.left)), 
-                            convert_to_nnf(UnaryOp(inner.right)), 'v')
-                            
-    if isinstance(node, BinaryOp):
-        return BinaryOp(
-            convert_to_nnf(node.left), convert_to_nnf(node.right), node.operator
-        )
-    if isinstance(node, UnaryOp):
-        return UnaryOp(convert_to_nnf(node.operand))
-    return node
+    # every (node, negated) pair is rewritten once; the pairs a result depends on
+    # are pushed first so they are ready when the pair itself is built
+    new: dict[tuple[int, bool], Node] = {}
+    stack: list[tuple[Node, bool, bool]] = [(node, False, False)]
+    while stack:
+        n, negated, ready = stack.pop()
+        key = (id(n), negated)
+        if key in new:
+            continue
+        if type(n) is UnaryOp and not negated and type(n.operand) is Variable:
+            # ~A is already NNF, and it also serves as the negation of A
+            new[key] = n
+            new.setdefault((id(n.operand), True), n)
+            continue
+        if not ready:
+            stack.append((n, negated, True))
+            if type(n) is UnaryOp:
+                stack.append((n.operand, not negated, False)) # ~~A => A
+            elif type(n) is BinaryOp and (not negated or n.operator in (_OP_OR, _OP_AND)):
+                stack.append((n.right, negated, False)) # De Morgan when negated
+                stack.append((n.left, negated, False))
+            elif type(n) is BinaryOp:
+                stack.append((n, False, False)) # ~(A -> B) is left as a negation
+            continue
+
+        if type(n) is UnaryOp:
+            out = new[(id(n.operand), not negated)]
+        elif type(n) is BinaryOp and not negated:
+            left = new[(id(n.left), False)]
+            right = new[(id(n.right), False)]
+            out = n if left is n.left and right is n.right else _mk_bin(left, right, n.operator)
+        elif type(n) is BinaryOp and n.operator in (_OP_OR, _OP_AND):
+            # ~(A v B) => ~A ^ ~B  and  ~(A ^ B) => ~A v ~B
+            out = _mk_bin(new[(id(n.left), True)], new[(id(n.right), True)],
+                          _OP_AND if n.operator == _OP_OR else _OP_OR)
+        elif type(n) is BinaryOp:
+            out = _mk_not(new[(id(n), False)])
+        else:
+            out = _mk_not(n) if negated else n
+        new[key] = out
+    return new[(id(node), False)]
 
 
-def distribute_or_over_and(node):
+def distribute_or_over_and(node: Node) -> Node:
     """Step 3: Distribute OR over AND to get CNF."""
-    if isinstance(node, BinaryOp):
-        node.left = distribute_or_over_and(node.left)
-        node.right = distribute_or_over_and(node.right)
-
-        if node.operator == 'v':
-            # (P ^ Q) v R => (P v R) ^ (Q v R)
-            if isinstance(node.left, BinaryOp) and node.left.operator == '^':
-                p, q, r = node.left.left, node.left.right, node.right
-                return distribute_or_over_and(BinaryOp(BinaryOp(p, r, 'v'), BinaryOp(q, r, 'v'), '^'))
-            
-            # P v (Q ^ R) => (P v Q) ^ (P v R)
-            elif isinstance(node.right, BinaryOp) and node.right.operator == '^':
-                p, q, r = node.left, node.right.left, node.right.right
-                return distribute_or_over_and(BinaryOp(BinaryOp(p, q, 'v'), BinaryOp(p, r, 'v'), '^'))
-    return node
-
-
-def get_variables(node, var_set):
-    """Helper to collect variable names from the AST."""
-    if isinstance(node, Variable):
-        var_set.add(node.name)
-    elif isinstance(node, UnaryOp):
-        get_variables(node.operand, var_set)
-    elif isinstance(node, BinaryOp):
-        get_variables(node.left, var_set)
-        get_variables(node.right, var_set)
+    new: dict[int, Node] = {}  # each shared subtree is distributed only once
+    for n in _post_order(node):
+        if type(n) is not BinaryOp:
+            new[id(n)] = n
+            continue
+        left = new[id(n.left)]
+        right = new[id(n.right)]
+        if n.operator == _OP_OR:
+            # both sides are CNF already: (P ^ Q) v (R ^ S) => (P v R) ^ (P v S) ^ (Q v R) ^ (Q v S)
+            left_clauses = _chain(left, _OP_AND)
+            right_clauses = _chain(right, _OP_AND)
+            if len(left_clauses) > 1 or len(right_clauses) > 1:
+                new[id(n)] = _balanced([_mk_bin(p, q, _OP_OR) for p in left_clauses for q in right_clauses], _OP_AND)
+                continue
+        if left is n.left and right is n.right:
+            new[id(n)] = n
+        else:
+            new[id(n)] = _mk_bin(left, right, n.operator)
+    return new[id(node)]
+
+
+def _negate(literal: Node) -> Node:
+    if type(literal) is UnaryOp:
+        return literal.operand
+    return _mk_not(literal)
+
+
+def tseitin(node: Node) -> Node:
+    """Step 3 (alternative): Tseitin encoding, a linear-size equisatisfiable CNF of an NNF formula."""
+    order = _post_order(node)
+    used = {n.name for n in order if type(n) is Variable}
+    counter = 0
+    clauses: list[list[Node]] = []
+    lit: dict[int, Node] = {}  # id(subformula) -> literal standing for it
+    for n in order:
+        if type(n) is Variable or (type(n) is UnaryOp and type(n.operand) is Variable):
+            lit[id(n)] = n
+            continue
+        if type(n) is not BinaryOp or n.operator not in (_OP_AND, _OP_OR):
+            # only literals are children of a '~' in NNF, and '->'/'<->' are already gone
+            raise ValueError(f"Tseitin encoding expects a formula in NNF, found: {n}")
+        counter += 1
+        while f"t{counter}" in used:  # never reuse a name from the formula
+            counter += 1
+        t = _mk_var(f"t{counter}")
+        a, b = lit[id(n.left)], lit[id(n.right)]
+        if n.operator == _OP_AND:
+            # t <-> (a ^ b):  (~t v a), (~t v b), (t v ~a v ~b)
+            clauses.append([_mk_not(t), a])
+            clauses.append([_mk_not(t), b])
+            clauses.append([t, _negate(a), _negate(b)])
+        else:
+            # t <-> (a v b):  (~t v a v b), (t v ~a), (t v ~b)
+            clauses.append([_mk_not(t), a, b])
+            clauses.append([t, _negate(a)])
+            clauses.append([t, _negate(b)])
+        lit[id(n)] = t
+    clauses.append([lit[id(node)]])  # the formula itself must hold
+    return _balanced([_balanced(c, _OP_OR) for c in clauses], _OP_AND)
+
+
+def _gathered(node: Node, clauses: dict[int, list[frozenset[int]]]) -> list[frozenset[int]]:
+    """Clauses of a '^' chain: the clause lists of its operands, left to right."""
+    result: list[frozenset[int]] = []
+    for n in _chain(node, _OP_AND):
+        result.extend(clauses[id(n)])
+    return result
+
+
+def to_cnf_clauses(node: Node, var_map: dict[str, int]) -> list[list[int]]:
+    """Step 3 fused with clause collection: CNF clauses of an NNF formula, numbered through var_map."""
+    order = _post_order(node)
+
+    # only chain heads get a clause list: the root and the operands of a '^';
+    # a 'v' inside a 'v' chain is flattened into its head instead of stored
+    heads = {id(node)}
+    for n in order:
+        if type(n) is BinaryOp and n.operator == _OP_AND:
+            heads.add(id(n.left))
+            heads.add(id(n.right))
+
+    clauses: dict[int, list[frozenset[int]]] = {}  # id(head) -> its clauses
+    for n in order:
+        if type(n) is BinaryOp and n.operator == _OP_AND:
+            continue  # joined lazily by _gathered
+        if type(n) is BinaryOp and n.operator == _OP_OR:
+            if id(n) in heads:
+                clauses[id(n)] = _disjunction_clauses(n, clauses)
+            continue
+
+        sign = 1
+        if type(n) is UnaryOp and type(n.operand) is Variable:  # ~A
+            operand, sign = n.operand, -1
+        elif type(n) is Variable:  # A
+            operand = n
+        else:
+            raise ValueError(f"Expected a formula in NNF, found: {n}")
+        var_id = var_map.get(operand.name)
+        if var_id is None:  # first time we see it
+            var_id = var_map[operand.name] = len(var_map) + 1
+        clauses[id(n)] = [frozenset((sign * var_id,))]
+    return [sorted(clause, key=abs) for clause in _gathered(node, clauses)]
+
+
+def _disjunction_clauses(node: Node, clauses: dict[int, list[frozenset[int]]]) -> list[frozenset[int]]:
+    """Clauses of a 'v' chain, distributing over the '^' operands in it."""
+    literals: set[int] = set()  # operands that are a single clause (literals, mostly)
+    products: list[list[frozenset[int]]] = []  # operands that are a real conjunction
+    for operand in _chain(node, _OP_OR):
+        operand_clauses = _gathered(operand, clauses)
+        if len(operand_clauses) == 1:
+            literals |= operand_clauses[0]
+        elif not operand_clauses:
+            return []  # an operand with no clauses is true, so the whole chain is
+        else:
+            products.append(operand_clauses)
+    if any(-lit in literals for lit in literals):
+        return []  # (A v ~A v ...) is always true
+
+    # (P ^ Q) v (R ^ S) => (P v R) ^ (P v S) ^ (Q v R) ^ (Q v S)
+    result = [frozenset(literals)]
+    for operand_clauses in products:
+        result = [
+            p | q
+            for p in result
+            for q in operand_clauses
+            if not any(-lit in p for lit in q)  # (A v ...) v (~A v ...) is always true
+        ]
+    return result
 
 
 class DIMACSGenerator:
-    def __init__(self, cnf_root):
+    """DIMACS output for a formula in CNF, or in NNF (it is distributed on the fly)."""
+
+    def __init__(self, cnf_root: Node):
         self.root = cnf_root
-        self.var_map = {}
-        self.clauses = []  # [[1, -2], [3], ...]
+        self.var_map: dict[str, int] = {}
+        self.clauses: list[list[int]] = []  # [[1, -2], [3], ...]
 
-    def generate(self):
-        var_set = set()
-        get_variables(self.root, var_set)
-        sorted_vars = sorted(list(var_set))
+    def generate(self) -> str:
+        out = io.StringIO()
+        self.write(out)
+        return out.getvalue()
 
-        for idx, var_name in enumerate(sorted_vars, 1):
-            self.var_map[var_name] = idx
+    def write(self, f: TextIO) -> None:
+        """Stream the DIMACS text to a file object, one clause line at a time."""
+        self.var_map.clear()
+        self.clauses.clear()
 
-        # traverse the CNF tree to collect clauses
-        self._collect_clauses(self.root)
+        self.clauses.extend(to_cnf_clauses(self.root, self.var_map))
 
-        output_lines = []
-        if sorted_vars:
-            vars_str = ", ".join(f"{name}={self.var_map[name]}" for name in sorted_vars)
-            output_lines.append(f"c Variable Map: {vars_str}")
+        if self.var_map:
+            # dicts keep insertion order, so this lists the variables by id
+            vars_str = ", ".join(f"{name}={var_id}" for name, var_id in self.var_map.items())
+            f.write(f"c Variable Map: {vars_str}")
         else:
-            output_lines.append("c Variable Map:")
+            f.write("c Variable Map:")
 
-        output_lines.append(f"p cnf {len(self.var_map)} {len(self.clauses)}")
+        f.write(f"\np cnf {len(self.var_map)} {len(self.clauses)}")
 
         for clause in self.clauses:
-            line = " ".join(map(str, clause)) + " 0"
-            output_lines.append(line)
+            f.write(f"\n{' '.join(map(str, clause))} 0")
 
-        return "\n".join(output_lines)
 
-    def _collect_clauses(self, node):
-        """collect clauses from the CNF AST"""
-        if isinstance(node, BinaryOp) and node.operator == '^':
-            self._collect_clauses(node.left)
-            self._collect_clauses(node.right)
-        else:
-            literals = []
-            self._collect_literals(node, literals)
-            self.clauses.append(literals)
-
-    def _collect_literals(self, node, literals):
-        """collect literals from a disjunction node"""
-        if isinstance(node, BinaryOp) and node.operator == 'v':
-            self._collect_literals(node.left, literals)
-            self._collect_literals(node.right, literals)
-        elif isinstance(node, UnaryOp):  # ~A
-            var_id = self.var_map[node.operand.name]
-            literals.append(-var_id)
-        elif isinstance(node, Variable):  # A
-            var_id = self.var_map[node.name]
-            literals.append(var_id)
-
-
-def main():
+def main(use_tseitin: bool = False) -> None:
     input_formula = "(A <-> B) ^ (A v ~B v C)"
     
     print(f"Input: {input_formula}\n")
@@ -258,14 +497,15 @@ def main():
 
         step1 = eliminate_implications(ast)
         step2 = convert_to_nnf(step1)
-        cnf_ast = distribute_or_over_and(step2)
 
-        dimacs_gen = DIMACSGenerator(cnf_ast)
-        result = dimacs_gen.generate()
+        if use_tseitin:
+            step2 = tseitin(step2)
+        # otherwise step 3 (distribution) happens while the generator collects clauses
+        dimacs_gen = DIMACSGenerator(step2)
 
         with open("dimacs_out.cnf", "w") as f:
             f.write(f"c Formula: {input_formula}\n")
-            f.write(result)
+            dimacs_gen.write(f)
             print("\nFile saved as 'dimacs_out.cnf'")
 
     except Exception as e:
@@ -273,4 +513,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(use_tseitin="--tseitin" in sys.argv[1:])
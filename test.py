@@ -1,20 +1,92 @@
+import functools
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 try:
-    from cnf import LogicParser, DIMACSGenerator, convert_to_nnf, eliminate_implications, distribute_or_over_and
+    from cnf import LogicParser, DIMACSGenerator, convert_to_nnf, eliminate_implications, tseitin
 except ImportError:
     print("Error: Could not import 'cnf' module. Ensure 'cnf.py' is in the same directory.")
     sys.exit(1)
 
-def process_logic_files():
+def _to_nnf(formula):
+    parser = LogicParser()
+    ast = parser.parse(formula)
+    ast = eliminate_implications(ast)
+    return convert_to_nnf(ast)
+
+@functools.lru_cache(maxsize=4096)
+def _formula_to_dimacs(formula, use_tseitin=False):
+    """The whole pipeline is pure, so identical formulas are converted only once."""
+    ast = _to_nnf(formula)
+    if use_tseitin:
+        ast = tseitin(ast)
+
+    # otherwise DIMACSGenerator distributes 'v' over '^' itself while collecting clauses
+    generator = DIMACSGenerator(ast)
+    return generator.generate()
+
+def _satisfiable(clauses):
+    """Small DPLL solver, enough for the formulas in input_files."""
+    pending = [[frozenset(c) for c in clauses]]
+    while pending:
+        cs = pending.pop()
+        while cs and all(cs):
+            unit = next((c for c in cs if len(c) == 1), None)
+            lit = next(iter(unit if unit is not None else cs[0]))
+            if unit is None:  # branch: try lit now, -lit later
+                pending.append([c - {lit} for c in cs if -lit not in c])
+            cs = [c - {-lit} for c in cs if lit not in c]
+        if not cs:  # every clause satisfied
+            return True
+    return False
+
+@functools.lru_cache(maxsize=4096)
+def _tseitin_agrees(formula):
+    """The Tseitin encoding must be satisfiable exactly when the distributed CNF is."""
+    nnf = _to_nnf(formula)
+    distributed = DIMACSGenerator(nnf)
+    distributed.generate()
+    encoded = DIMACSGenerator(tseitin(nnf))
+    encoded.generate()
+    return _satisfiable(distributed.clauses) == _satisfiable(encoded.clauses)
+
+def _convert_one(input_path, output_path, use_tseitin=False, check_tseitin=False):
+    """Convert a single input file in a worker; returns the Tseitin check result, or None if not checked."""
+    filename = os.path.basename(input_path)
+    try:
+        with open(input_path, "r", encoding="utf-8") as f:
+            formula = f.read().strip()
+
+        if not formula:
+            return None
+
+        dimacs_output = _formula_to_dimacs(formula, use_tseitin)
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(f"c Formula: {formula}\n{dimacs_output}")
+
+    except Exception as e:
+        print(f"Error processing {filename}: {e}")
+        return None
+
+    if not check_tseitin:
+        return None
+    try:
+        return _tseitin_agrees(formula)
+    except Exception as e:
+        # the file itself converted fine; report the check on its own, not as agreement
+        print(f"Tseitin check could not run for {filename}: {e!r}")
+        return None
+
+def process_logic_files(use_tseitin=False, check_tseitin=False):
     input_dir = "input_files"
     output_dir = "output_files"
-            
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
 
-    files = [f for f in os.listdir(input_dir) if f.endswith(".txt")]
+    os.makedirs(output_dir, exist_ok=True)
+
+    with os.scandir(input_dir) as it:
+        files = [e.name for e in it if e.name.endswith(".txt") and e.is_file()]
 
     if not files:
         print(f"No .txt files found in '{input_dir}'.")
@@ -22,36 +94,27 @@ def process_logic_files():
 
     print(f"Processing {len(files)} files...")
 
-    for filename in files:
-        input_path = os.path.join(input_dir, filename)
-        #change input1 to output 1
-        output_filename = filename.replace("input", "output")
-        output_path = os.path.join(output_dir, os.path.splitext(output_filename)[0] + ".cnf")
-
-        try:
-            with open(input_path, "r", encoding="utf-8") as f:
-                formula = f.read().strip()
-            
-            if not formula:
-                continue
-
-            parser = LogicParser()
-            ast = parser.parse(formula)
-            ast = eliminate_implications(ast)
-            ast = convert_to_nnf(ast)
-            cnf_ast = distribute_or_over_and(ast)            
-            
-            generator = DIMACSGenerator(cnf_ast)
-            dimacs_output = generator.generate()
-
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(f"c Formula: {formula}\n")
-                f.write(dimacs_output)
-            
-        except Exception as e:
-            print(f"Error processing {filename}: {e}")
+    input_paths = [f"{input_dir}/{filename}" for filename in files]
+    #change input1 to output 1
+    output_paths = [f"{output_dir}/{filename[:-4].replace('input', 'output')}.cnf" for filename in files]
+
+    # files are independent, so convert them on all cores
+    convert = functools.partial(_convert_one, use_tseitin=use_tseitin, check_tseitin=check_tseitin)
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        checks = list(executor.map(convert, input_paths, output_paths, chunksize=16))
+
+    for filename, agrees in zip(files, checks):
+        if agrees is False:
+            print(f"Tseitin check failed for {filename}: satisfiability differs from the distributed CNF")
 
     print("Conversion complete. Check 'output_files' directory.")
 
 if __name__ == "__main__":
-    process_logic_files()
\ No newline at end of file
+    # --tseitin writes the Tseitin encoding instead of the distributed CNF;
+    # --check-tseitin keeps the distributed output and also verifies Tseitin against it
+    # (it distributes and solves both CNFs, so it is only meant for small inputs)
+    args = sys.argv[1:]
+    if "--tseitin" in args and "--check-tseitin" in args:
+        print("Error: --check-tseitin distributes every formula, so it cannot be combined with --tseitin.")
+        sys.exit(2)
+    process_logic_files(use_tseitin="--tseitin" in args, check_tseitin="--check-tseitin" in args)
\ No newline at end of file